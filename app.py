@@ -1,11 +1,46 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response
 from muzzy_bhai import InstagramAnalyticsScraper
 from datetime import datetime
-import json
+from concurrent.futures import ThreadPoolExecutor
+import fastjson
 import os
+import pandas as pd
 
 app = Flask(__name__)
 
+# Reference-file writes happen off the request path
+_io_pool = ThreadPoolExecutor(max_workers=2)
+
+
+def _write_atomic(path, body):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def _save_snapshot(dirname, analytics):
+    """
+    Persist one analysis as data/<user>_<ts>/stats.json + posts.parquet.
+
+    Parquet keeps the posts table columnar – several times smaller on disk
+    than indented JSON and much faster to read back for re-analysis.
+    """
+    os.makedirs(dirname, exist_ok=True)
+    stats = dict(analytics)
+    posts = stats.pop('posts', None)
+
+    _write_atomic(os.path.join(dirname, 'stats.json'), fastjson.dumps(stats, indent=True))
+
+    if posts:
+        try:
+            pd.DataFrame(posts).to_parquet(
+                os.path.join(dirname, 'posts.parquet'), compression='zstd'
+            )
+        except Exception:
+            # No parquet engine available – fall back to JSON so nothing is lost
+            _write_atomic(os.path.join(dirname, 'posts.json'), fastjson.dumps(posts))
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -26,13 +61,16 @@ def analyze():
         if not analytics:
             return jsonify({'error': f'Could not fetch data for @{username}'}), 404
         
-        # Save the data for reference
-        os.makedirs('data', exist_ok=True)
-        filename = f"data/{username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(analytics, f, indent=2, ensure_ascii=False, default=str)
-        
-        return jsonify(analytics)
+        # Serialize once with the fastest available encoder; the same bytes
+        # serve both the on-disk reference file and the response.
+        body = fastjson.dumps(analytics, indent=True)
+
+        # Save the data for reference in the background – the client should
+        # only wait for the scrape, not for disk I/O
+        snapshot_dir = f"data/{username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        _io_pool.submit(_save_snapshot, snapshot_dir, analytics)
+
+        return Response(body, mimetype='application/json')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,42 @@
+"""
+Fastest-available JSON encoder/decoder for the scraper's export paths.
+
+Prefers orjson (Rust codec, native datetime/numpy support), falls back
+to ujson (~3x stdlib), then stdlib json. dumps always returns bytes so
+callers can write straight to binary files or HTTP responses.
+"""
+
+try:
+    import orjson as _orjson
+
+    def dumps(obj, *, indent: bool = False) -> bytes:
+        option = _orjson.OPT_NON_STR_KEYS | _orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= _orjson.OPT_INDENT_2
+        return _orjson.dumps(obj, default=str, option=option)
+
+    def loads(data):
+        return _orjson.loads(data)
+
+except ImportError:
+    try:
+        import ujson as _ujson
+
+        def dumps(obj, *, indent: bool = False) -> bytes:
+            return _ujson.dumps(
+                obj, indent=2 if indent else 0, default=str
+            ).encode("utf-8")
+
+        def loads(data):
+            return _ujson.loads(data)
+
+    except ImportError:
+        import json as _json
+
+        def dumps(obj, *, indent: bool = False) -> bytes:
+            return _json.dumps(
+                obj, indent=2 if indent else None, default=str
+            ).encode("utf-8")
+
+        def loads(data):
+            return _json.loads(data)
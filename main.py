@@ -1,846 +1,1369 @@
-import instaloader
-import pandas as pd
-import time
-import os
-import sys
-import re
-import json
-import logging
-from datetime import datetime
-from functools import wraps
-from typing import List, Tuple, Dict, Any
-
-from google import genai
-from google.genai import types
-from google.api_core.exceptions import ResourceExhausted
-
-# -------------------------------------------------------------------
-# 🔧 CONFIGURATION
-# -------------------------------------------------------------------
-
-# IMPORTANT: Do NOT hardcode real API keys if you will share this file.
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "").strip()
-
-if not GEMINI_API_KEY:
-    print("⚠️ No Gemini API key detected – category/location will fall back to heuristic only.")
-else:
-    print("✅ Gemini API key detected.")
-
-# Scraper settings
-MAX_POSTS = int(os.environ.get("MAX_POSTS", "30"))  # posts per profile
-SLEEP_DELAY = float(os.environ.get("SLEEP_DELAY", "2.0"))  # delay between posts
-MAX_FOLLOWERS_FETCH = int(os.environ.get("MAX_FOLLOWERS_FETCH", "500"))  # safety cap
-
-# Optional scheduling (only used if --schedule is provided via CLI)
-DEFAULT_SCHEDULE_MINUTES = int(os.environ.get("SCHEDULE_MINUTES", "0"))
-
-# Optional login via env (session reuse or login)
-INSTA_USERNAME = os.environ.get("INSTA_USERNAME", "").strip()
-INSTA_PASSWORD = os.environ.get("INSTA_PASSWORD", "").strip()
-
-# Quiet down Instaloader logs a bit
-logging.getLogger("instaloader").setLevel(logging.WARNING)
-
-# Regex utils
-MENTION_RE = re.compile(r"@([A-Za-z0-9_.]+)")
-AD_KEYWORDS = ["#ad", "#sponsored", "#collab", "paid partnership"]
-
-
-# -------------------------------------------------------------------
-# 🔁 BACKOFF DECORATOR FOR ERROR RECOVERY
-# -------------------------------------------------------------------
-def with_backoff(max_retries: int = 3, base_delay: float = 2.0):
-    """
-    Simple exponential backoff decorator for network-sensitive functions.
-    """
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            delay = base_delay
-            last_error = None
-            for attempt in range(max_retries):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    last_error = e
-                    msg = str(e)
-                    # If Instagram says "please wait a few minutes", don't spam retries
-                    if "Please wait a few minutes before you try again" in msg:
-                        print("[!] Instagram is temporarily rate limiting / blocking this IP.")
-                        print("    Cannot continue scraping right now for this profile.")
-                        break
-
-                    if attempt == max_retries - 1:
-                        print(f"[!] {func.__name__} failed after {max_retries} attempts: {e}")
-                        raise
-                    print(f"[!] {func.__name__} error on attempt {attempt+1}/{max_retries}: {e} "
-                          f"– retrying in {delay:.1f}s...")
-                    time.sleep(delay)
-                    delay *= 2
-            if last_error:
-                raise last_error
-        return wrapper
-    return decorator
-
-
-# -------------------------------------------------------------------
-# 🧩 INSTALOADER INSTANCE (AUTH + RATE-LIMIT-FRIENDLY)
-# -------------------------------------------------------------------
-def get_instaloader_instance() -> instaloader.Instaloader:
-    """
-    Create and return a configured Instaloader instance.
-
-    - Uses env INSTA_USERNAME / INSTA_PASSWORD if available
-    - Reuses session file .instaloader-session-<username> if present
-    - Falls back to public (unauthenticated) mode otherwise
-    """
-    L = instaloader.Instaloader(
-        download_pictures=False,
-        download_videos=False,
-        download_video_thumbnails=False,
-        download_geotags=False,
-        download_comments=False,
-        save_metadata=False,
-        compress_json=False,
-        max_connection_attempts=3,
-        user_agent=(
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/91.0.4472.124 Safari/537.36"
-        ),
-    )
-
-    if INSTA_USERNAME:
-        session_file = f".instaloader-session-{INSTA_USERNAME}"
-        # Try to load existing session
-        try:
-            if os.path.exists(session_file):
-                print(f"📂 Loading existing session for {INSTA_USERNAME}...")
-                L.load_session_from_file(INSTA_USERNAME, session_file)
-                print("✅ Session loaded (authenticated).")
-            elif INSTA_PASSWORD:
-                print(f"🔐 Logging in as {INSTA_USERNAME}...")
-                L.login(INSTA_USERNAME, INSTA_PASSWORD)
-                L.save_session_to_file(session_file)
-                print("✅ Logged in & session saved.")
-            else:
-                print("ℹ️ INSTA_USERNAME set but no session file and no INSTA_PASSWORD – using public mode.")
-        except Exception as e:
-            print(f"⚠️ Could not login/load session – using public mode: {e}")
-    else:
-        print("ℹ️ No INSTA_USERNAME – using public (unauthenticated) Instaloader session.")
-
-    return L
-
-
-# -------------------------------------------------------------------
-# 🔧 UTILS – HASHTAGS & MENTIONS
-# -------------------------------------------------------------------
-def extract_hashtags(caption: str) -> List[str]:
-    """
-    Extract hashtags from a caption string.
-    Returns a list of lowercase hashtag strings without the '#'.
-    """
-    if not caption:
-        return []
-    words = caption.split()
-    tags = [w[1:].lower() for w in words if w.startswith("#") and len(w) > 1]
-    return tags
-
-
-def extract_mentions_from_caption(caption: str) -> List[str]:
-    """
-    Extract @mentions from caption text using regex.
-    """
-    if not caption:
-        return []
-    return [m.lower() for m in MENTION_RE.findall(caption)]
-
-
-# -------------------------------------------------------------------
-# 🧠 LOCAL HEURISTIC FOR CATEGORY + LOCATION (NO GEMINI / GEMINI FAILS)
-# -------------------------------------------------------------------
-def heuristic_category_location(bio: str, captions: List[str]) -> Dict[str, str]:
-    """
-    Simple rule-based inference for category + location
-    when Gemini is not available or quota is exhausted.
-    """
-    text = (bio or "") + " " + " ".join(captions or [])
-    text_lower = text.lower()
-
-    category = "Unknown (heuristic)"
-
-    if any(k in text_lower for k in ["poetry", "poet", "shayari", "urdu"]):
-        category = "Poetry / Writing"
-    elif any(k in text_lower for k in ["fitness", "gym", "workout", "coach", "trainer"]):
-        category = "Fitness"
-    elif any(k in text_lower for k in ["travel", "wanderlust", "trip", "tourism"]):
-        category = "Travel"
-    elif any(k in text_lower for k in ["food", "chef", "recipe", "baking", "restaurant"]):
-        category = "Food"
-    elif any(k in text_lower for k in ["fashion", "style", "outfit", "ootd", "makeup", "beauty"]):
-        category = "Fashion / Beauty"
-    elif any(k in text_lower for k in ["developer", "coding", "programmer", "software", "tech"]):
-        category = "Tech / Developer"
-    elif any(k in text_lower for k in ["photography", "photographer", "camera", "portrait"]):
-        category = "Photography"
-    elif any(k in text_lower for k in ["music", "singer", "songwriter", "producer", "dj"]):
-        category = "Music / Artist"
-
-    location = "Unknown (heuristic)"
-    known_locations = {
-        "mumbai": "Mumbai, India",
-        "bombay": "Mumbai, India",
-        "pune": "Pune, India",
-        "bangalore": "Bengaluru, India",
-        "bengaluru": "Bengaluru, India",
-        "delhi": "Delhi, India",
-        "new delhi": "New Delhi, India",
-        "hyderabad": "Hyderabad, India",
-        "chennai": "Chennai, India",
-        "kolkata": "Kolkata, India",
-        "karachi": "Karachi, Pakistan",
-        "lahore": "Lahore, Pakistan",
-        "islamabad": "Islamabad, Pakistan",
-        "dubai": "Dubai, UAE",
-        "london": "London, UK",
-        "new york": "New York, USA",
-        "los angeles": "Los Angeles, USA",
-        "toronto": "Toronto, Canada",
-        "vancouver": "Vancouver, Canada",
-        "sydney": "Sydney, Australia",
-        "melbourne": "Melbourne, Australia",
-        "paris": "Paris, France",
-    }
-
-    for key, loc in known_locations.items():
-        if key in text_lower:
-            location = loc
-            break
-
-    return {"category": category, "location": location}
-
-
-# -------------------------------------------------------------------
-# 🤖 GEMINI – CATEGORY & LOCATION INFERENCE (WITH CLEAN FALLBACK)
-# -------------------------------------------------------------------
-def infer_category_and_location(bio: str, captions: List[str], api_key: str) -> Dict[str, str]:
-    """
-    Uses Gemini to infer 'category' and 'location' from bio + recent captions.
-    Falls back to heuristic on any error.
-    """
-    captions = captions or []
-
-    if not api_key:
-        print("ℹ️ No Gemini API key – using local heuristic for category/location.")
-        return heuristic_category_location(bio, captions)
-
-    captions_text = " || ".join(captions[:5]) if captions else ""
-    prompt = f"""
-    Analyze the following Instagram profile data:
-    BIO: {bio}
-    RECENT POST CAPTIONS: {captions_text}
-
-    Task:
-    1. Identify the 'Category' or Niche (e.g., Fitness, Travel, Food, Tech, Fashion, Meme).
-    2. Identify the 'Location' (City, Country) where the creator is likely based. If uncertain, say 'Unknown'.
-
-    Return ONLY a JSON string with keys 'category' and 'location'.
-    """
-
-    try:
-        client = genai.Client(api_key=api_key)
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json"
-            ),
-        )
-
-        if hasattr(response, "text") and response.text:
-            return json.loads(response.text)
-
-        print("⚠️ Gemini returned empty response – using local heuristic.")
-        return heuristic_category_location(bio, captions)
-
-    except ResourceExhausted:
-        print("⚠️ Gemini quota exhausted – using local heuristic for category/location.")
-        return heuristic_category_location(bio, captions)
-
-    except Exception:
-        print("⚠️ Gemini error – using local heuristic for category/location.")
-        return heuristic_category_location(bio, captions)
-
-
-# -------------------------------------------------------------------
-# 🧮 CORE ANALYSIS LOGIC
-# -------------------------------------------------------------------
-@with_backoff(max_retries=3, base_delay=2.0)
-def load_profile(L: instaloader.Instaloader, username: str) -> instaloader.Profile:
-    return instaloader.Profile.from_username(L.context, username)
-
-
-def analyze_profile(
-    username: str,
-    export: bool = True,
-    print_report: bool = True,
-) -> Tuple[Dict[str, Any], pd.DataFrame, Dict[str, Any]]:
-    """
-    Scrape an Instagram profile and compute analytics.
-
-    Returns:
-      stats: dict of profile-level metrics (for comparison, display)
-      df:    per-post DataFrame
-      extra: dict with hashtags, mentions, ER timeline, export paths, followers list, etc.
-    """
-
-    if username.startswith("@"):
-        username = username[1:]
-
-    print(f"\n🚀 STARTING ANALYSIS FOR: @{username}")
-    L = get_instaloader_instance()
-
-    # 1. Load Profile
-    try:
-        profile = load_profile(L, username)
-    except Exception as e:
-        print(f"[-] Error loading profile '{username}': {e}")
-        return {}, pd.DataFrame(), {}
-
-    print(f"✅ Loaded Profile: {profile.full_name} (@{profile.username})")
-    print(f"   Followers: {profile.followers:,} | Posts: {profile.mediacount:,}")
-    print(f"... Fetching last {MAX_POSTS} posts for @{username} ...")
-
-    # 2. Scrape Posts (with light rate limiting)
-    posts_data: List[Dict[str, Any]] = []
-    total_requests = 0
-    failed_posts = 0
-
-    try:
-        posts = profile.get_posts()
-        for i, post in enumerate(posts):
-            if i >= MAX_POSTS:
-                break
-
-            try:
-                likes = getattr(post, "likes", 0) or 0
-                comments = getattr(post, "comments", 0) or 0
-                is_video = bool(getattr(post, "is_video", False))
-
-                try:
-                    video_views = getattr(post, "video_view_count", 0) if is_video else 0
-                except Exception:
-                    video_views = 0
-
-                caption = post.caption if post.caption else ""
-                date_local = post.date_local
-
-                typename = getattr(post, "typename", "")
-                if typename == "GraphImage":
-                    content_type = "Photo"
-                elif typename == "GraphVideo":
-                    content_type = "Video/Reel"
-                elif typename == "GraphSidecar":
-                    content_type = "Carousel"
-                else:
-                    content_type = "Unknown"
-
-                mentions = set(extract_mentions_from_caption(caption))
-                try:
-                    for m in getattr(post, "caption_mentions", []):
-                        mentions.add(m.username.lower())
-                except Exception:
-                    pass
-                try:
-                    for u in getattr(post, "tagged_users", []):
-                        mentions.add(u.username.lower())
-                except Exception:
-                    pass
-
-                text_lower = caption.lower()
-                is_brand_collab = any(k in text_lower for k in AD_KEYWORDS)
-
-                posts_data.append(
-                    {
-                        "post_index": i + 1,
-                        "shortcode": getattr(post, "shortcode", ""),
-                        "date": date_local,
-                        "likes": likes,
-                        "comments": comments,
-                        "is_video": is_video,
-                        "video_view_count": video_views,
-                        "caption": caption,
-                        "hashtags": extract_hashtags(caption),
-                        "mentions": list(mentions),
-                        "content_type": content_type,
-                        "is_brand_collab": is_brand_collab,
-                    }
-                )
-
-                total_requests += 1
-
-                if (i + 1) % 5 == 0:
-                    print(f"   ... scraped {i+1} posts")
-
-                # 🔁 Light rate limiting: short sleep every post, longer break every 20 posts
-                if SLEEP_DELAY > 0:
-                    if (i + 1) % 20 == 0:
-                        print("   ⏸️ Taking a longer break to avoid rate limits...")
-                        time.sleep(SLEEP_DELAY * 3)
-                    else:
-                        time.sleep(SLEEP_DELAY)
-
-            except instaloader.exceptions.TooManyRequestsException as tre:
-                print(f"[!] Too many requests while scraping posts: {tre}")
-                print("    Stopping post scraping early to avoid hard block.")
-                failed_posts += 1
-                break
-            except instaloader.exceptions.ConnectionException as ce:
-                print(f"[!] Connection issue while scraping posts: {ce}")
-                failed_posts += 1
-                time.sleep(30)
-                continue
-            except Exception as e:
-                print(f"[!] Skipping one post due to error: {e}")
-                failed_posts += 1
-                continue
-
-    except Exception as e:
-        print(f"[-] Warning during post scraping: {e}")
-
-    df = pd.DataFrame(posts_data)
-
-    # 3. Compute Metrics
-    stats: Dict[str, Any] = {
-        "username": profile.username,
-        "full_name": profile.full_name,
-        "bio": profile.biography or "",
-        "followers": profile.followers,
-        "following": profile.followees,
-        "total_posts": profile.mediacount,
-        "is_verified": profile.is_verified,
-        "avg_likes": 0.0,
-        "avg_comments": 0.0,
-        "avg_views": 0.0,
-        "engagement_rate": 0.0,
-        "viral_percentage": 0.0,
-        "posts_per_week": 0.0,
-        "brand_collabs": 0,
-    }
-
-    extra: Dict[str, Any] = {
-        "top_hashtags": {},
-        "top_mentions": {},
-        "content_distribution": {},
-        "er_timeline": [],
-        "posts_failed": failed_posts,
-        "total_requests": total_requests,
-    }
-
-    if not df.empty:
-        stats["avg_likes"] = float(df["likes"].mean())
-        stats["avg_comments"] = float(df["comments"].mean())
-
-        video_df = df[df["is_video"] == True]
-        if not video_df.empty:
-            stats["avg_views"] = float(video_df["video_view_count"].mean())
-        else:
-            stats["avg_views"] = 0.0
-
-        followers_count = stats["followers"]
-        if followers_count > 0:
-            df["engagement"] = df["likes"] + df["comments"]
-            df["engagement_rate_post"] = df["engagement"] / followers_count * 100.0
-            stats["engagement_rate"] = float(df["engagement_rate_post"].mean())
-
-            if not video_df.empty:
-                video_df = video_df.copy()
-                video_df["engagement"] = video_df["likes"] + video_df["comments"]
-                video_df["engagement_rate_post"] = (
-                    video_df["engagement"] / followers_count * 100.0
-                )
-                avg_video_eng = video_df["engagement_rate_post"].mean()
-                viral_videos = video_df[video_df["engagement_rate_post"] > 3 * avg_video_eng]
-                stats["viral_percentage"] = (
-                    len(viral_videos) / len(video_df) * 100.0 if len(video_df) > 0 else 0.0
-                )
-            else:
-                stats["viral_percentage"] = 0.0
-        else:
-            stats["engagement_rate"] = 0.0
-            stats["viral_percentage"] = 0.0
-
-        if len(df) > 1:
-            date_range_days = (df["date"].max() - df["date"].min()).days
-            if date_range_days > 0:
-                weeks = date_range_days / 7.0
-                stats["posts_per_week"] = len(df) / weeks
-            else:
-                stats["posts_per_week"] = 0.0
-
-        stats["brand_collabs"] = int(df["is_brand_collab"].sum())
-
-        all_hashtags: List[str] = []
-        for hs in df["hashtags"]:
-            all_hashtags.extend(hs)
-        if all_hashtags:
-            hashtags_series = pd.Series(all_hashtags)
-            top_hashtags_series = hashtags_series.value_counts().head(20)
-            extra["top_hashtags"] = top_hashtags_series.to_dict()
-
-        all_mentions: List[str] = []
-        for ms in df["mentions"]:
-            all_mentions.extend(ms)
-        if all_mentions:
-            mentions_series = pd.Series(all_mentions)
-            top_mentions_series = mentions_series.value_counts().head(20)
-            extra["top_mentions"] = top_mentions_series.to_dict()
-
-        content_dist_series = df["content_type"].value_counts(normalize=True) * 100.0
-        extra["content_distribution"] = content_dist_series.to_dict()
-
-        er_timeline = []
-        if "engagement_rate_post" in df.columns:
-            df_sorted = df.sort_values("date")
-            for _, row in df_sorted.iterrows():
-                er_timeline.append(
-                    {
-                        "date": row["date"].strftime("%Y-%m-%d"),
-                        "post_index": int(row["post_index"]),
-                        "er_percent": float(round(row["engagement_rate_post"], 3)),
-                    }
-                )
-        extra["er_timeline"] = er_timeline
-
-    else:
-        print("[-] No posts could be scraped. Some metrics will be zero.")
-
-    # ===== Followers & following lists (AUTH REQUIRED) =====
-    followers_list: List[str] = []
-    following_list: List[str] = []
-
-    # Only even try if we are logged in
-    if L.context.username:
-        try:
-            print("🔎 Fetching followers list (may be capped)...")
-            for idx, f in enumerate(profile.get_followers()):
-                followers_list.append(f.username)
-                if idx + 1 >= MAX_FOLLOWERS_FETCH:
-                    print(f"   ⏸️ Reached MAX_FOLLOWERS_FETCH={MAX_FOLLOWERS_FETCH}, stopping.")
-                    break
-        except Exception as e:
-            print(f"⚠️ Could not fetch followers list: {e}")
-
-        try:
-            print("🔎 Fetching following list (followees, capped)...")
-            for idx, f in enumerate(profile.get_followees()):
-                following_list.append(f.username)
-                if idx + 1 >= MAX_FOLLOWERS_FETCH:
-                    print(f"   ⏸️ Reached MAX_FOLLOWERS_FETCH={MAX_FOLLOWERS_FETCH}, stopping.")
-                    break
-        except Exception as e:
-            print(f"⚠️ Could not fetch following list: {e}")
-    else:
-        print("ℹ️ Not logged in – cannot fetch followers/following lists. "
-              "Set INSTA_USERNAME and use a saved session.")
-
-    extra["followers_list"] = followers_list
-    extra["following_list"] = following_list
-
-    # 4. Category + Location (Gemini + heuristic)
-    captions = [p["caption"] for p in posts_data] if posts_data else []
-    print("🤖 Inferring category and location (Gemini + heuristic)...")
-    ai_res = infer_category_and_location(stats["bio"], captions, GEMINI_API_KEY)
-    stats["category"] = ai_res.get("category", "Unknown")
-    stats["location"] = ai_res.get("location", "Unknown")
-
-    # ----------------------------------------------------------------
-    # 5. Export Options: everything into a per-user folder + logs
-    # ----------------------------------------------------------------
-    base_name = stats["username"] or username or "profile"
-    output_dir = os.path.join(os.getcwd(), base_name)
-    os.makedirs(output_dir, exist_ok=True)
-
-    posts_csv = os.path.join(output_dir, f"{base_name}_posts.csv")
-    profile_csv = os.path.join(output_dir, f"{base_name}_profile_summary.csv")
-    profile_json = os.path.join(output_dir, f"{base_name}_profile_summary.json")
-    profile_xlsx = os.path.join(output_dir, f"{base_name}_profile_summary.xlsx")
-    posts_log = os.path.join(output_dir, f"{base_name}_posts_log.jsonl")
-
-    followers_log = os.path.join(output_dir, f"{base_name}_followers.jsonl")
-    following_log = os.path.join(output_dir, f"{base_name}_following.jsonl")
-    interactions_log = os.path.join(output_dir, f"{base_name}_interactions_summary.json")
-
-    if export:
-        # Posts CSV (per-post structured data)
-        df.to_csv(posts_csv, index=False)
-
-        # Posts log file – JSONL (1 JSON object per line for every post)
-        try:
-            with open(posts_log, "w", encoding="utf-8") as f:
-                for p in posts_data:
-                    p_serializable = dict(p)
-                    if isinstance(p_serializable.get("date"), datetime):
-                        p_serializable["date"] = p_serializable["date"].isoformat()
-                    else:
-                        p_serializable["date"] = str(p_serializable.get("date"))
-                    f.write(json.dumps(p_serializable, ensure_ascii=False) + "\n")
-        except Exception as e:
-            print(f"⚠️ Could not write posts log file ({posts_log}): {e}")
-
-        # Followers JSONL
-        try:
-            with open(followers_log, "w", encoding="utf-8") as f:
-                for uname in followers_list:
-                    f.write(json.dumps({"username": uname}, ensure_ascii=False) + "\n")
-        except Exception as e:
-            print(f"⚠️ Could not write followers log file ({followers_log}): {e}")
-
-        # Following JSONL
-        try:
-            with open(following_log, "w", encoding="utf-8") as f:
-                for uname in following_list:
-                    f.write(json.dumps({"username": uname}, ensure_ascii=False) + "\n")
-        except Exception as e:
-            print(f"⚠️ Could not write following log file ({following_log}): {e}")
-
-        # Interactions summary (top interacted users = top_mentions)
-        try:
-            interactions_summary = {
-                "username": stats["username"],
-                "generated_at": datetime.now().isoformat(),
-                "top_mentions": extra.get("top_mentions", {}),
-                "posts_failed": failed_posts,
-                "total_requests": total_requests,
-            }
-            with open(interactions_log, "w", encoding="utf-8") as f:
-                json.dump(interactions_summary, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"⚠️ Could not write interactions summary file ({interactions_log}): {e}")
-
-        # Profile summary (CSV / JSON / Excel)
-        profile_df = pd.DataFrame(
-            [
-                {
-                    "Profile Name": stats["full_name"],
-                    "Username": stats["username"],
-                    "Bio": stats["bio"],
-                    "Location": stats["location"],
-                    "Category": stats["category"],
-                    "Followers": stats["followers"],
-                    "Following": stats["following"],
-                    "Total Posts": stats["total_posts"],
-                    "Is Verified": stats["is_verified"],
-                    "Avg Likes": round(stats["avg_likes"], 1),
-                    "Avg Comments": round(stats["avg_comments"], 1),
-                    "Avg Views (Reels)": round(stats["avg_views"], 1),
-                    "Engagement Rate %": round(stats["engagement_rate"], 3),
-                    "Viral Video %": round(stats["viral_percentage"], 2),
-                    "Brand Collaborations (Recent)": stats["brand_collabs"],
-                    "Posts Per Week": round(stats["posts_per_week"], 2),
-                    "Scraping Date": datetime.now().strftime("%Y-%m-%d"),
-                }
-            ]
-        )
-        profile_df.to_csv(profile_csv, index=False)
-        profile_df.to_json(profile_json, orient="records", indent=2)
-        try:
-            profile_df.to_excel(profile_xlsx, index=False)
-        except Exception as e:
-            print(f"⚠️ Could not write Excel file ({profile_xlsx}): {e}")
-
-    # ----------------------------------------------------------------
-    # 6. Print Final Report (line by line)
-    # ----------------------------------------------------------------
-    if print_report:
-        print("\n========================================")
-        print(f"📊 REPORT: @{stats['username']}")
-        print(f"Name: {stats['full_name']}")
-        print("========================================")
-
-        print(f"📝 Bio: {stats['bio'].replace(chr(10), ' ')}")
-        print(f"📍 Location (AI/Heuristic): {stats['location']}")
-        print(f"🏷️  Category (AI/Heuristic): {stats['category']}")
-        print("--------------------")
-        print(f"👥 Followers: {stats['followers']:,}")
-        print(f"👉 Following: {stats['following']:,}")
-        print(f"📝 Total Posts: {stats['total_posts']:,}")
-        print(f"✅ Verified: {stats['is_verified']}")
-        print()
-        print(f"👍 Avg Likes: {stats['avg_likes']:.1f}")
-        print(f"💬 Avg Comments: {stats['avg_comments']:.1f}")
-        print(f"🎥 Avg Views (Reels): {stats['avg_views']:.1f}")
-        print()
-        print(f"🚀 Engagement Rate: {stats['engagement_rate']:.3f}%")
-        print(f"🔥 Viral Video %: {stats['viral_percentage']:.2f}%")
-        print(f"🤝 Brand Collaborations (recent sample): {stats['brand_collabs']}")
-        print(f"📅 Posts Per Week: {stats['posts_per_week']:.2f}")
-        print(f"📆 Scraping Date: {datetime.now().strftime('%Y-%m-%d')}")
-        print(f"📉 Posts failed during scrape: {failed_posts}")
-        print(f"📡 Total requests (approx): {total_requests}")
-        print("========================================")
-
-        if extra["content_distribution"]:
-            print("\n📺 Content Type Distribution (% of recent posts):")
-            for ctype, pct in extra["content_distribution"].items():
-                print(f"  - {ctype}: {pct:.1f}%")
-        else:
-            print("\n📺 Content Type Distribution: No posts.")
-
-        if extra["top_hashtags"]:
-            print("\n#️⃣ Top Hashtags:")
-            for tag, freq in extra["top_hashtags"].items():
-                print(f"  #{tag}: {freq} times")
-        else:
-            print("\n#️⃣ Top Hashtags: None detected.")
-
-        if extra["top_mentions"]:
-            print("\n👤 Frequently Mentioned / Tagged Accounts:")
-            for user, freq in extra["top_mentions"].items():
-                print(f"  @{user}: {freq} times")
-        else:
-            print("\n👤 Frequently Mentioned / Tagged Accounts: None detected.")
-
-        if extra["er_timeline"]:
-            print("\n📈 Engagement Rate Over Time (most recent posts):")
-            for item in extra["er_timeline"][-10:]:
-                print(
-                    f"  {item['date']} (Post #{item['post_index']}): "
-                    f"{item['er_percent']:.3f}%"
-                )
-        else:
-            print("\n📈 Engagement Rate Over Time: No data.")
-
-        print("\n📂 Exported Files (inside folder):")
-        print(f"  Folder: {output_dir}")
-        print(f"  - Posts CSV: {posts_csv}")
-        print(f"  - Posts Log (JSONL): {posts_log}")
-        print(f"  - Followers Log (JSONL): {followers_log}")
-        print(f"  - Following Log (JSONL): {following_log}")
-        print(f"  - Interactions Summary (JSON): {interactions_log}")
-        print(f"  - Profile CSV: {profile_csv}")
-        print(f"  - Profile JSON: {profile_json}")
-        if os.path.exists(profile_xlsx):
-            print(f"  - Profile Excel: {profile_xlsx}")
-        print("\n[+] Analysis complete.\n")
-
-    # Attach export paths to extra
-    extra["output_dir"] = output_dir
-    extra["posts_csv"] = posts_csv
-    extra["posts_log"] = posts_log
-    extra["followers_log"] = followers_log
-    extra["following_log"] = following_log
-    extra["interactions_log"] = interactions_log
-    extra["profile_csv"] = profile_csv
-    extra["profile_json"] = profile_json
-    extra["profile_xlsx"] = profile_xlsx
-
-    return stats, df, extra
-
-
-# -------------------------------------------------------------------
-# 🔁 MULTI-PROFILE COMPARISON & OPTIONAL SCHEDULING
-# -------------------------------------------------------------------
-def analyze_multiple_profiles(usernames: List[str], schedule_minutes: int = 0):
-    """
-    Analyze multiple profiles sequentially.
-    If schedule_minutes > 0, repeats the whole batch periodically.
-    """
-
-    def run_once():
-        summaries = []
-        for i, uname in enumerate(usernames):
-            print(f"\n====== [{i+1}/{len(usernames)}] {uname} ======")
-            stats, df, extra = analyze_profile(uname, export=True, print_report=True)
-            if stats:
-                summaries.append(stats)
-            time.sleep(SLEEP_DELAY)
-
-        if summaries:
-            summary_df = pd.DataFrame(summaries)
-            cols = [
-                "username",
-                "full_name",
-                "followers",
-                "following",
-                "total_posts",
-                "avg_likes",
-                "avg_comments",
-                "avg_views",
-                "engagement_rate",
-                "viral_percentage",
-                "posts_per_week",
-                "category",
-                "location",
-            ]
-            cols = [c for c in cols if c in summary_df.columns]
-            print("\n📊 Comparison Summary (key metrics):")
-            print(summary_df[cols].to_string(index=False))
-
-            summary_df.to_csv("profiles_comparison.csv", index=False)
-            summary_df.to_json("profiles_comparison.json", orient="records", indent=2)
-            try:
-                summary_df.to_excel("profiles_comparison.xlsx", index=False)
-            except Exception as e:
-                print(f"⚠️ Could not write profiles_comparison.xlsx: {e}")
-            print("\n📂 Comparison exports:")
-            print("  - profiles_comparison.csv")
-            print("  - profiles_comparison.json")
-            if os.path.exists("profiles_comparison.xlsx"):
-                print("  - profiles_comparison.xlsx")
-
-    if schedule_minutes > 0:
-        while True:
-            print(f"\n⏰ Scheduled run at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            run_once()
-            print(f"\n⏳ Sleeping for {schedule_minutes} minutes before next run...")
-            time.sleep(schedule_minutes * 60)
-    else:
-        run_once()
-
-
-# -------------------------------------------------------------------
-# 🏁 CLI ENTRYPOINT
-# -------------------------------------------------------------------
-if __name__ == "__main__":
-    args = sys.argv[1:]
-    schedule_minutes = 0
-    usernames: List[str] = []
-
-    if not args:
-        entered = input("Enter Instagram Username (or multiple separated by spaces): ").strip()
-        if entered:
-            usernames = entered.split()
-        else:
-            print("No username provided.")
-            sys.exit(0)
-    else:
-        if "--schedule" in args:
-            idx = args.index("--schedule")
-            if idx + 1 < len(args):
-                try:
-                    schedule_minutes = int(args[idx + 1])
-                except ValueError:
-                    print("⚠️ Invalid schedule minutes value; ignoring scheduling.")
-                    schedule_minutes = 0
-                filtered = []
-                for i, a in enumerate(args):
-                    if i in (idx, idx + 1):
-                        continue
-                    filtered.append(a)
-                usernames = filtered
-            else:
-                print("⚠️ --schedule provided without minutes. Ignoring scheduling.")
-                usernames = [a for a in args if a != "--schedule"]
-        else:
-            usernames = args
-
-    if not usernames:
-        print("No usernames provided.")
-        sys.exit(0)
-
-    if len(usernames) == 1 and schedule_minutes == 0:
-        analyze_profile(usernames[0], export=True, print_report=True)
-    else:
-        analyze_multiple_profiles(usernames, schedule_minutes=schedule_minutes)
+import argparse
+import instaloader
+import pandas as pd
+import csv
+import itertools
+import time
+import os
+import random
+import sys
+import re
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from functools import lru_cache, wraps
+from typing import List, Tuple, Dict, Any
+
+import fastjson
+
+from google import genai
+from google.genai import types
+from google.api_core.exceptions import ResourceExhausted
+
+# -------------------------------------------------------------------
+# 🔧 CONFIGURATION
+# -------------------------------------------------------------------
+
+# IMPORTANT: Do NOT hardcode real API keys if you will share this file.
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "").strip()
+
+if not GEMINI_API_KEY:
+    print("⚠️ No Gemini API key detected – category/location will fall back to heuristic only.")
+else:
+    print("✅ Gemini API key detected.")
+
+# One Gemini client for the whole process – auth and connection setup
+# happen once instead of on every profile.
+try:
+    _GENAI_CLIENT = genai.Client(api_key=GEMINI_API_KEY) if GEMINI_API_KEY else None
+except Exception as _e:
+    print(f"⚠️ Could not initialise Gemini client – heuristic only: {_e}")
+    _GENAI_CLIENT = None
+
+# Scraper settings
+MAX_POSTS = int(os.environ.get("MAX_POSTS", "30"))  # posts per profile
+MAX_FOLLOWERS_FETCH = int(os.environ.get("MAX_FOLLOWERS_FETCH", "500"))  # safety cap
+
+# Optional scheduling (only used if --schedule is provided via CLI)
+DEFAULT_SCHEDULE_MINUTES = int(os.environ.get("SCHEDULE_MINUTES", "0"))
+
+# Optional login via env (session reuse or login)
+INSTA_USERNAME = os.environ.get("INSTA_USERNAME", "").strip()
+INSTA_PASSWORD = os.environ.get("INSTA_PASSWORD", "").strip()
+
+# Quiet down Instaloader logs a bit
+logging.getLogger("instaloader").setLevel(logging.WARNING)
+
+# Regex utils – one pattern matches both #hashtags and @mentions so a
+# caption is scanned in a single pass
+TOKEN_RE = re.compile(r"[#@]([A-Za-z0-9_.]+)")
+AD_KEYWORDS = ["#ad", "#sponsored", "#collab", "paid partnership"]
+
+# Instagram GraphQL typename → human-readable content type
+CONTENT_TYPE_MAP = {
+    "GraphImage": "Photo",
+    "GraphVideo": "Video/Reel",
+    "GraphSidecar": "Carousel",
+}
+
+# Keyword tables shared by the Aho-Corasick fast path and the plain
+# fallback scans. Category order is the match priority.
+CATEGORY_KEYWORDS = [
+    ("Poetry / Writing", ["poetry", "poet", "shayari", "urdu"]),
+    ("Fitness", ["fitness", "gym", "workout", "coach", "trainer"]),
+    ("Travel", ["travel", "wanderlust", "trip", "tourism"]),
+    ("Food", ["food", "chef", "recipe", "baking", "restaurant"]),
+    ("Fashion / Beauty", ["fashion", "style", "outfit", "ootd", "makeup", "beauty"]),
+    ("Tech / Developer", ["developer", "coding", "programmer", "software", "tech"]),
+    ("Photography", ["photography", "photographer", "camera", "portrait"]),
+    ("Music / Artist", ["music", "singer", "songwriter", "producer", "dj"]),
+]
+
+KNOWN_LOCATIONS = {
+    "mumbai": "Mumbai, India",
+    "bombay": "Mumbai, India",
+    "pune": "Pune, India",
+    "bangalore": "Bengaluru, India",
+    "bengaluru": "Bengaluru, India",
+    "delhi": "Delhi, India",
+    "new delhi": "New Delhi, India",
+    "hyderabad": "Hyderabad, India",
+    "chennai": "Chennai, India",
+    "kolkata": "Kolkata, India",
+    "karachi": "Karachi, Pakistan",
+    "lahore": "Lahore, Pakistan",
+    "islamabad": "Islamabad, Pakistan",
+    "dubai": "Dubai, UAE",
+    "london": "London, UK",
+    "new york": "New York, USA",
+    "los angeles": "Los Angeles, USA",
+    "toronto": "Toronto, Canada",
+    "vancouver": "Vancouver, Canada",
+    "sydney": "Sydney, Australia",
+    "melbourne": "Melbourne, Australia",
+    "paris": "Paris, France",
+}
+
+# Optional Aho-Corasick automaton: all keywords matched in one linear scan
+# over the text instead of one substring search per keyword.
+try:
+    import ahocorasick
+
+    _KEYWORD_AC = ahocorasick.Automaton()
+    for _rank, (_category, _words) in enumerate(CATEGORY_KEYWORDS):
+        for _w in _words:
+            _KEYWORD_AC.add_word(_w, ("category", _rank, _category))
+    for _rank, (_key, _loc) in enumerate(KNOWN_LOCATIONS.items()):
+        _KEYWORD_AC.add_word(_key, ("location", _rank, _loc))
+    for _kw in AD_KEYWORDS:
+        _KEYWORD_AC.add_word(_kw, ("ad", 0, True))
+    _KEYWORD_AC.make_automaton()
+except ImportError:
+    _KEYWORD_AC = None
+
+# Fallback path (no pyahocorasick): keyword → (priority rank, bucket) maps
+# plus compiled alternations, so matching is one regex sweep per table
+# instead of one substring scan per keyword. The lookahead form reports
+# overlapping matches, mirroring the automaton's output.
+_CATEGORY_KEYWORD_RANKS = {
+    _w: (_rank, _category)
+    for _rank, (_category, _words) in enumerate(CATEGORY_KEYWORDS)
+    for _w in _words
+}
+_LOCATION_RANKS = {
+    _key: (_rank, _loc) for _rank, (_key, _loc) in enumerate(KNOWN_LOCATIONS.items())
+}
+
+
+def _keyword_alternation(words) -> "re.Pattern":
+    ordered = sorted(words, key=len, reverse=True)
+    return re.compile(r"(?=(" + "|".join(map(re.escape, ordered)) + r"))")
+
+
+_CATEGORY_RE = _keyword_alternation(_CATEGORY_KEYWORD_RANKS)
+_LOCATION_RE = _keyword_alternation(_LOCATION_RANKS)
+_AD_RE = re.compile("|".join(map(re.escape, AD_KEYWORDS)))
+
+# Shared worker pool for background I/O that can overlap the throttled
+# post loop (followers/following pagination etc.). Deliberately threads,
+# not processes: the per-profile CPU work (counters, regex scans) is
+# accumulated inline during the scrape loop and is a rounding error next
+# to the network waits, while a process pool would add per-task pickling
+# and could not share the logged-in Instaloader session.
+EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# Column order for the streamed per-post CSV export
+POSTS_CSV_HEADERS = [
+    "post_index",
+    "shortcode",
+    "date",
+    "likes",
+    "comments",
+    "is_video",
+    "video_view_count",
+    "caption",
+    "hashtags",
+    "mentions",
+    "content_type",
+    "is_brand_collab",
+]
+
+
+def scan_keywords(text_lower: str) -> Dict[str, Any]:
+    """
+    Scan already-lowercased text for category, location and ad keywords.
+
+    Returns {"category": str|None, "location": str|None, "is_ad": bool}.
+    Uses the Aho-Corasick automaton (one pass over the text) when
+    pyahocorasick is installed, otherwise falls back to per-keyword
+    substring scans with the same priority semantics.
+    """
+    result: Dict[str, Any] = {"category": None, "location": None, "is_ad": False}
+
+    if _KEYWORD_AC is not None:
+        best = {"category": None, "location": None}
+        for _, (kind, rank, value) in _KEYWORD_AC.iter(text_lower):
+            if kind == "ad":
+                result["is_ad"] = True
+            elif best[kind] is None or rank < best[kind][0]:
+                best[kind] = (rank, value)
+        if best["category"] is not None:
+            result["category"] = best["category"][1]
+        if best["location"] is not None:
+            result["location"] = best["location"][1]
+        return result
+
+    best_cat = None
+    for m in _CATEGORY_RE.finditer(text_lower):
+        rank, category = _CATEGORY_KEYWORD_RANKS[m.group(1)]
+        if best_cat is None or rank < best_cat[0]:
+            best_cat = (rank, category)
+    if best_cat is not None:
+        result["category"] = best_cat[1]
+
+    best_loc = None
+    for m in _LOCATION_RE.finditer(text_lower):
+        rank, loc = _LOCATION_RANKS[m.group(1)]
+        if best_loc is None or rank < best_loc[0]:
+            best_loc = (rank, loc)
+    if best_loc is not None:
+        result["location"] = best_loc[1]
+
+    result["is_ad"] = _AD_RE.search(text_lower) is not None
+    return result
+
+
+# -------------------------------------------------------------------
+# 🔁 BACKOFF DECORATOR FOR ERROR RECOVERY
+# -------------------------------------------------------------------
+# Server hints like "please wait 30 seconds" embedded in error messages
+WAIT_SECONDS_RE = re.compile(r"wait (\d+) seconds")
+
+
+def with_backoff(max_retries: int = 3, base_delay: float = 2.0, max_delay: float = 30.0):
+    """
+    Exponential backoff with full jitter for network-sensitive functions.
+
+    Honours a server-suggested "wait N seconds" hint when one appears in
+    the error message; otherwise sleeps a random delay in
+    [0, base_delay * 2**attempt] so parallel workers don't all retry in
+    lockstep and re-collide. Hard rate limits
+    (TooManyRequestsException) are re-raised immediately and left to
+    Instaloader's RateController instead of being retried inline.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            last_error = None
+            for attempt in range(max_retries):
+                try:
+                    return func(*args, **kwargs)
+                except instaloader.exceptions.TooManyRequestsException:
+                    raise
+                except Exception as e:
+                    last_error = e
+                    msg = str(e)
+                    # If Instagram says "please wait a few minutes", don't spam retries
+                    if "Please wait a few minutes before you try again" in msg:
+                        print("[!] Instagram is temporarily rate limiting / blocking this IP.")
+                        print("    Cannot continue scraping right now for this profile.")
+                        break
+
+                    if attempt == max_retries - 1:
+                        print(f"[!] {func.__name__} failed after {max_retries} attempts: {e}")
+                        raise
+
+                    hint = WAIT_SECONDS_RE.search(msg)
+                    if hint:
+                        delay = min(float(hint.group(1)), max_delay)
+                    else:
+                        delay = min(random.uniform(0, base_delay * 2 ** attempt), max_delay)
+                    print(f"[!] {func.__name__} error on attempt {attempt+1}/{max_retries}: {e} "
+                          f"– retrying in {delay:.1f}s...")
+                    time.sleep(delay)
+            if last_error:
+                raise last_error
+        return wrapper
+    return decorator
+
+
+# -------------------------------------------------------------------
+# 🧩 INSTALOADER INSTANCE (AUTH + RATE-LIMIT-FRIENDLY)
+# -------------------------------------------------------------------
+class AdaptiveRateController(instaloader.RateController):
+    """
+    Server-aware pacing instead of fixed per-post sleeps: Instaloader's
+    RateController tracks request timestamps per query type and decides
+    when to wait; we stretch its sleeps by an adaptive safety factor.
+    Every uneventful wait decays the factor toward 1.0 and every 429
+    doubles it (capped), so quiet periods speed back up and rate-limited
+    periods get real headroom instead of one fixed multiplier.
+    """
+
+    _MIN_FACTOR = 1.0
+    _MAX_FACTOR = 8.0
+
+    def __init__(self, ctx):
+        super().__init__(ctx)
+        self._factor = 1.5
+
+    def sleep(self, secs: float):
+        super().sleep(secs * self._factor)
+        self._factor = max(self._MIN_FACTOR, self._factor * 0.9)
+
+    def handle_429(self, query_type: str):
+        self._factor = min(self._MAX_FACTOR, self._factor * 2.0)
+        super().handle_429(query_type)
+
+
+def get_instaloader_instance() -> instaloader.Instaloader:
+    """
+    Create and return a configured Instaloader instance.
+
+    - Uses env INSTA_USERNAME / INSTA_PASSWORD if available
+    - Reuses session file .instaloader-session-<username> if present
+    - Falls back to public (unauthenticated) mode otherwise
+    """
+    L = instaloader.Instaloader(
+        download_pictures=False,
+        download_videos=False,
+        download_video_thumbnails=False,
+        download_geotags=False,
+        download_comments=False,
+        save_metadata=False,
+        compress_json=False,
+        max_connection_attempts=3,
+        user_agent=(
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/91.0.4472.124 Safari/537.36"
+        ),
+        rate_controller=lambda ctx: AdaptiveRateController(ctx),
+    )
+
+    if INSTA_USERNAME:
+        session_file = f".instaloader-session-{INSTA_USERNAME}"
+        # Try to load existing session
+        try:
+            if os.path.exists(session_file):
+                print(f"📂 Loading existing session for {INSTA_USERNAME}...")
+                L.load_session_from_file(INSTA_USERNAME, session_file)
+                print("✅ Session loaded (authenticated).")
+            elif INSTA_PASSWORD:
+                print(f"🔐 Logging in as {INSTA_USERNAME}...")
+                L.login(INSTA_USERNAME, INSTA_PASSWORD)
+                L.save_session_to_file(session_file)
+                print("✅ Logged in & session saved.")
+            else:
+                print("ℹ️ INSTA_USERNAME set but no session file and no INSTA_PASSWORD – using public mode.")
+        except Exception as e:
+            print(f"⚠️ Could not login/load session – using public mode: {e}")
+    else:
+        print("ℹ️ No INSTA_USERNAME – using public (unauthenticated) Instaloader session.")
+
+    return L
+
+
+# Shared instance so repeat/batch analyses reuse the same login session and
+# the underlying requests.Session keep-alive connection pool.
+_L_SINGLETON = None
+
+
+def get_shared_instaloader() -> instaloader.Instaloader:
+    global _L_SINGLETON
+    if _L_SINGLETON is None:
+        _L_SINGLETON = get_instaloader_instance()
+    return _L_SINGLETON
+
+
+def close_shared_instaloader() -> None:
+    """Close the shared instance and its connection pool (idempotent)."""
+    global _L_SINGLETON
+    if _L_SINGLETON is not None:
+        try:
+            _L_SINGLETON.close()
+        except Exception:
+            pass
+        _L_SINGLETON = None
+
+
+# -------------------------------------------------------------------
+# 🔧 UTILS – HASHTAGS & MENTIONS
+# -------------------------------------------------------------------
+def extract_tags_and_mentions(caption_lower: str) -> Tuple[List[str], List[str]]:
+    """
+    Extract #hashtags and @mentions from an already-lowercased caption in
+    one regex sweep. Returns (hashtags, mentions) without the marker char.
+
+    Callers lowercase the caption once and reuse that string for keyword
+    scanning too, instead of lowering each token separately.
+    """
+    hashtags: List[str] = []
+    mentions: List[str] = []
+    if not caption_lower:
+        return hashtags, mentions
+    for m in TOKEN_RE.finditer(caption_lower):
+        (hashtags if m.group(0)[0] == "#" else mentions).append(m.group(1))
+    return hashtags, mentions
+
+
+# -------------------------------------------------------------------
+# 🧠 LOCAL HEURISTIC FOR CATEGORY + LOCATION (NO GEMINI / GEMINI FAILS)
+# -------------------------------------------------------------------
+def heuristic_category_location(bio: str, captions: List[str]) -> Dict[str, str]:
+    """
+    Simple rule-based inference for category + location
+    when Gemini is not available or quota is exhausted.
+    """
+    text = (bio or "") + " " + " ".join(captions or [])
+    hits = scan_keywords(text.lower())
+    return {
+        "category": hits["category"] or "Unknown (heuristic)",
+        "location": hits["location"] or "Unknown (heuristic)",
+    }
+
+
+# -------------------------------------------------------------------
+# 🤖 GEMINI – CATEGORY & LOCATION INFERENCE (WITH CLEAN FALLBACK)
+# -------------------------------------------------------------------
+@lru_cache(maxsize=256)
+def _gemini_category_location(bio_key: str, captions_key: Tuple[str, ...]) -> Tuple[str, str]:
+    """
+    Memoized Gemini call – scheduled re-runs over the same bio/captions
+    don't spend quota again. Returns (category, location); raises on
+    failure so errors are not cached.
+    """
+    captions_text = " || ".join(captions_key)
+    prompt = f"""
+    Analyze the following Instagram profile data:
+    BIO: {bio_key}
+    RECENT POST CAPTIONS: {captions_text}
+
+    Task:
+    1. Identify the 'Category' or Niche (e.g., Fitness, Travel, Food, Tech, Fashion, Meme).
+    2. Identify the 'Location' (City, Country) where the creator is likely based. If uncertain, say 'Unknown'.
+
+    Return ONLY a JSON string with keys 'category' and 'location'.
+    """
+
+    response = _GENAI_CLIENT.models.generate_content(
+        model="gemini-2.0-flash",
+        contents=prompt,
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json"
+        ),
+    )
+
+    if hasattr(response, "text") and response.text:
+        data = fastjson.loads(response.text)
+        return data.get("category", "Unknown"), data.get("location", "Unknown")
+
+    raise ValueError("Gemini returned empty response")
+
+
+def infer_category_and_location(bio: str, captions: List[str], api_key: str) -> Dict[str, str]:
+    """
+    Infer 'category' and 'location' from bio + recent captions.
+
+    The local heuristic runs first and Gemini is only consulted for the
+    fields it could not classify, so confidently-classified profiles cost
+    no network round-trip or quota. Falls back to heuristic on any error.
+    """
+    captions = captions or []
+
+    h = heuristic_category_location(bio, captions)
+    heuristic_unsure = (
+        h["category"].startswith("Unknown") or h["location"].startswith("Unknown")
+    )
+    if not heuristic_unsure:
+        return h
+
+    if not api_key or _GENAI_CLIENT is None:
+        print("ℹ️ No Gemini API key – using local heuristic for category/location.")
+        return h
+
+    try:
+        category, location = _gemini_category_location(
+            (bio or "")[:500], tuple(captions[:5])
+        )
+        # Keep any field the heuristic already pinned down confidently
+        return {
+            "category": h["category"] if not h["category"].startswith("Unknown") else category,
+            "location": h["location"] if not h["location"].startswith("Unknown") else location,
+        }
+
+    except ResourceExhausted:
+        print("⚠️ Gemini quota exhausted – using local heuristic for category/location.")
+        return h
+
+    except Exception:
+        print("⚠️ Gemini error – using local heuristic for category/location.")
+        return h
+
+
+# -------------------------------------------------------------------
+# 🧮 CORE ANALYSIS LOGIC
+# -------------------------------------------------------------------
+@with_backoff(max_retries=3, base_delay=2.0)
+def load_profile(L: instaloader.Instaloader, username: str) -> instaloader.Profile:
+    return instaloader.Profile.from_username(L.context, username)
+
+
+def _collect_usernames(iter_fn, cap: int) -> List[str]:
+    """
+    Enumerate an Instaloader user iterator (followers/followees) up to cap.
+    Runs on a worker thread; Instaloader's RateController is shared across
+    the context, so concurrent paging still respects rate limits.
+    """
+    names: List[str] = []
+    try:
+        for user in itertools.islice(iter_fn(), cap):
+            names.append(user.username)
+        if len(names) >= cap:
+            print(f"   ⏸️ Reached MAX_FOLLOWERS_FETCH={cap}, stopping.")
+    except Exception as e:
+        print(f"⚠️ Could not fetch full user list: {e}")
+    return names
+
+
+def analyze_profile(
+    username: str,
+    L: instaloader.Instaloader = None,
+    export: bool = True,
+    print_report: bool = True,
+    export_xlsx: bool = False,
+) -> Tuple[Dict[str, Any], pd.DataFrame, Dict[str, Any]]:
+    """
+    Scrape an Instagram profile and compute analytics.
+
+    Pass a shared Instaloader instance as `L` when analyzing several
+    profiles so login/session loading and the TLS connection pool are
+    reused; otherwise a module-level shared instance is used.
+
+    XLSX output is opt-in (`export_xlsx=True`): openpyxl serialization is
+    an order of magnitude slower than CSV/JSON, so it is skipped by
+    default and written on the worker pool when requested.
+
+    Returns:
+      stats: dict of profile-level metrics (for comparison, display)
+      df:    per-post DataFrame
+      extra: dict with hashtags, mentions, ER timeline, export paths, followers list, etc.
+    """
+
+    if username.startswith("@"):
+        username = username[1:]
+
+    print(f"\n🚀 STARTING ANALYSIS FOR: @{username}")
+    if L is None:
+        L = get_shared_instaloader()
+
+    # 1. Load Profile
+    try:
+        profile = load_profile(L, username)
+    except Exception as e:
+        print(f"[-] Error loading profile '{username}': {e}")
+        return {}, pd.DataFrame(), {}
+
+    print(f"✅ Loaded Profile: {profile.full_name} (@{profile.username})")
+    print(f"   Followers: {profile.followers:,} | Posts: {profile.mediacount:,}")
+    print(f"... Fetching last {MAX_POSTS} posts for @{username} ...")
+
+    # Export paths are known as soon as the profile is loaded, so per-post
+    # records can be streamed to disk as they are scraped.
+    base_name = profile.username or username or "profile"
+    output_dir = os.path.join(os.getcwd(), base_name)
+    if export:
+        os.makedirs(output_dir, exist_ok=True)
+
+    posts_csv = os.path.join(output_dir, f"{base_name}_posts.csv")
+    profile_csv = os.path.join(output_dir, f"{base_name}_profile_summary.csv")
+    profile_json = os.path.join(output_dir, f"{base_name}_profile_summary.json")
+    profile_xlsx = os.path.join(output_dir, f"{base_name}_profile_summary.xlsx")
+    posts_log = os.path.join(output_dir, f"{base_name}_posts_log.jsonl")
+
+    followers_log = os.path.join(output_dir, f"{base_name}_followers.jsonl")
+    following_log = os.path.join(output_dir, f"{base_name}_following.jsonl")
+    interactions_log = os.path.join(output_dir, f"{base_name}_interactions_summary.json")
+
+    # 2. Scrape Posts (with light rate limiting)
+    posts_data: List[Dict[str, Any]] = []
+    total_requests = 0
+    failed_posts = 0
+
+    # All post-level aggregations are accumulated inline during the scrape
+    # loop, so no pandas passes over the frame are needed afterwards.
+    hashtag_counter: Counter = Counter()
+    mention_counter: Counter = Counter()
+    ctype_counter: Counter = Counter()
+    likes_sum = 0
+    comments_sum = 0
+    views_sum = 0
+    video_count = 0
+    brand_count = 0
+    er_values: List[float] = []
+    video_er_values: List[float] = []
+    post_dates: List[Any] = []
+    # Only the first few captions feed category/location inference
+    first_five_captions: List[str] = []
+    followers_count = profile.followers or 0
+
+    # Followers/following pagination starts in the background so its network
+    # I/O overlaps with the sleep-throttled post loop (auth required).
+    followers_future = None
+    followees_future = None
+    if L.context.username:
+        print("🔎 Fetching followers/following lists in the background (capped)...")
+        followers_future = EXECUTOR.submit(
+            _collect_usernames, profile.get_followers, MAX_FOLLOWERS_FETCH
+        )
+        followees_future = EXECUTOR.submit(
+            _collect_usernames, profile.get_followees, MAX_FOLLOWERS_FETCH
+        )
+
+    # Posts log (JSONL) and posts CSV – both streamed row by row as posts
+    # are scraped, so no second serialization pass over the data.
+    log_fh = None
+    csv_fh = None
+    csv_writer = None
+    if export:
+        try:
+            log_fh = open(posts_log, "wb", buffering=1 << 20)
+        except Exception as e:
+            print(f"⚠️ Could not open posts log file ({posts_log}): {e}")
+        try:
+            csv_fh = open(posts_csv, "w", encoding="utf-8", newline="", buffering=1 << 20)
+            csv_writer = csv.writer(csv_fh)
+            csv_writer.writerow(POSTS_CSV_HEADERS)
+        except Exception as e:
+            print(f"⚠️ Could not open posts CSV file ({posts_csv}): {e}")
+            csv_writer = None
+
+    try:
+        # islice pushes the MAX_POSTS cap into C instead of a per-iteration check
+        for i, post in enumerate(itertools.islice(profile.get_posts(), MAX_POSTS)):
+            try:
+                likes = getattr(post, "likes", 0) or 0
+                comments = getattr(post, "comments", 0) or 0
+                is_video = bool(getattr(post, "is_video", False))
+
+                try:
+                    video_views = getattr(post, "video_view_count", 0) if is_video else 0
+                except Exception:
+                    video_views = 0
+
+                caption = post.caption if post.caption else ""
+                date_local = post.date_local
+
+                content_type = CONTENT_TYPE_MAP.get(
+                    getattr(post, "typename", ""), "Unknown"
+                )
+
+                caption_lower = caption.lower()
+                hashtags, caption_mentions = extract_tags_and_mentions(caption_lower)
+                mentions = set(caption_mentions)
+                try:
+                    for m in getattr(post, "caption_mentions", []):
+                        mentions.add(m.username.lower())
+                except Exception:
+                    pass
+                try:
+                    for u in getattr(post, "tagged_users", []):
+                        mentions.add(u.username.lower())
+                except Exception:
+                    pass
+
+                is_brand_collab = scan_keywords(caption_lower)["is_ad"]
+
+                hashtag_counter.update(hashtags)
+                mention_counter.update(mentions)
+                ctype_counter[content_type] += 1
+
+                likes_sum += likes
+                comments_sum += comments
+                brand_count += int(is_brand_collab)
+                er_post = (
+                    (likes + comments) / followers_count * 100.0 if followers_count else 0.0
+                )
+                if is_video:
+                    views_sum += video_views or 0
+                    video_count += 1
+                    video_er_values.append(er_post)
+                er_values.append(er_post)
+                post_dates.append(date_local)
+                if len(first_five_captions) < 5:
+                    first_five_captions.append(caption)
+
+                p = {
+                    "post_index": i + 1,
+                    "shortcode": getattr(post, "shortcode", ""),
+                    "date": date_local,
+                    "likes": likes,
+                    "comments": comments,
+                    "is_video": is_video,
+                    "video_view_count": video_views,
+                    "caption": caption,
+                    "hashtags": hashtags,
+                    "mentions": list(mentions),
+                    "content_type": content_type,
+                    "is_brand_collab": is_brand_collab,
+                }
+                posts_data.append(p)
+
+                if log_fh is not None:
+                    try:
+                        # fastjson serializes the datetime natively – no
+                        # manual isoformat() copy of the record needed
+                        log_fh.write(fastjson.dumps(p) + b"\n")
+                    except Exception as e:
+                        print(f"⚠️ Could not write post to log file: {e}")
+
+                if csv_writer is not None:
+                    try:
+                        csv_writer.writerow(
+                            [
+                                i + 1,
+                                p["shortcode"],
+                                date_local.isoformat()
+                                if isinstance(date_local, datetime)
+                                else str(date_local),
+                                likes,
+                                comments,
+                                is_video,
+                                video_views,
+                                caption,
+                                "|".join(hashtags),
+                                "|".join(p["mentions"]),
+                                content_type,
+                                is_brand_collab,
+                            ]
+                        )
+                    except Exception as e:
+                        print(f"⚠️ Could not write post to CSV file: {e}")
+
+                total_requests += 1
+
+                if (i + 1) % 5 == 0:
+                    print(f"   ... scraped {i+1} posts")
+
+                # Rate limiting is handled by AdaptiveRateController, which
+                # sleeps between paginator fetches based on actual request
+                # telemetry instead of a fixed per-post delay.
+
+            except instaloader.exceptions.TooManyRequestsException as tre:
+                print(f"[!] Too many requests while scraping posts: {tre}")
+                print("    Stopping post scraping early to avoid hard block.")
+                failed_posts += 1
+                break
+            except instaloader.exceptions.ConnectionException as ce:
+                print(f"[!] Connection issue while scraping posts: {ce}")
+                failed_posts += 1
+                time.sleep(30)
+                continue
+            except Exception as e:
+                print(f"[!] Skipping one post due to error: {e}")
+                failed_posts += 1
+                continue
+
+    except Exception as e:
+        print(f"[-] Warning during post scraping: {e}")
+    finally:
+        for fh in (log_fh, csv_fh):
+            if fh is not None:
+                try:
+                    fh.close()
+                except Exception:
+                    pass
+
+    df = pd.DataFrame(posts_data)
+
+    # Category + Location inference is submitted now so the Gemini round
+    # trip overlaps with the followers/following join below.
+    print("🤖 Inferring category and location (Gemini + heuristic)...")
+    ai_future = EXECUTOR.submit(
+        infer_category_and_location,
+        profile.biography or "",
+        first_five_captions,
+        GEMINI_API_KEY,
+    )
+
+    # 3. Compute Metrics
+    stats: Dict[str, Any] = {
+        "username": profile.username,
+        "full_name": profile.full_name,
+        "bio": profile.biography or "",
+        "followers": profile.followers,
+        "following": profile.followees,
+        "total_posts": profile.mediacount,
+        "is_verified": profile.is_verified,
+        "avg_likes": 0.0,
+        "avg_comments": 0.0,
+        "avg_views": 0.0,
+        "engagement_rate": 0.0,
+        "viral_percentage": 0.0,
+        "posts_per_week": 0.0,
+        "brand_collabs": 0,
+    }
+
+    extra: Dict[str, Any] = {
+        "top_hashtags": {},
+        "top_mentions": {},
+        "content_distribution": {},
+        "er_timeline": [],
+        "posts_failed": failed_posts,
+        "total_requests": total_requests,
+    }
+
+    # Metrics come straight from the accumulators filled during the scrape
+    # loop – a single pass instead of several pandas traversals.
+    n_posts = len(posts_data)
+    if n_posts:
+        stats["avg_likes"] = likes_sum / n_posts
+        stats["avg_comments"] = comments_sum / n_posts
+        stats["avg_views"] = views_sum / video_count if video_count else 0.0
+
+        if followers_count > 0:
+            df["engagement"] = df["likes"] + df["comments"]
+            df["engagement_rate_post"] = er_values
+            stats["engagement_rate"] = sum(er_values) / n_posts
+
+            if video_er_values:
+                avg_video_eng = sum(video_er_values) / len(video_er_values)
+                viral_count = sum(1 for r in video_er_values if r > 3 * avg_video_eng)
+                stats["viral_percentage"] = viral_count / len(video_er_values) * 100.0
+            else:
+                stats["viral_percentage"] = 0.0
+        else:
+            stats["engagement_rate"] = 0.0
+            stats["viral_percentage"] = 0.0
+
+        if n_posts > 1:
+            date_range_days = (max(post_dates) - min(post_dates)).days
+            if date_range_days > 0:
+                weeks = date_range_days / 7.0
+                stats["posts_per_week"] = n_posts / weeks
+            else:
+                stats["posts_per_week"] = 0.0
+
+        stats["brand_collabs"] = brand_count
+
+        # Tallied inline during the scrape loop – no extra caption pass here
+        if hashtag_counter:
+            extra["top_hashtags"] = dict(hashtag_counter.most_common(20))
+        if mention_counter:
+            extra["top_mentions"] = dict(mention_counter.most_common(20))
+
+        extra["content_distribution"] = {
+            ctype: count / n_posts * 100.0 for ctype, count in ctype_counter.most_common()
+        }
+
+        # Timeline straight from the per-post accumulator lists (already
+        # parallel); an index sort avoids a pandas sort + iterrows pass.
+        if followers_count > 0:
+            order = sorted(range(n_posts), key=post_dates.__getitem__)
+            extra["er_timeline"] = [
+                {
+                    "date": post_dates[k].strftime("%Y-%m-%d"),
+                    "post_index": posts_data[k]["post_index"],
+                    "er_percent": round(er_values[k], 3),
+                }
+                for k in order
+            ]
+
+    else:
+        print("[-] No posts could be scraped. Some metrics will be zero.")
+
+    # ===== Followers & following lists (AUTH REQUIRED) =====
+    # Collected on worker threads since the profile loaded; just join here.
+    followers_list: List[str] = []
+    following_list: List[str] = []
+
+    if followers_future is not None:
+        try:
+            followers_list = followers_future.result()
+            following_list = followees_future.result()
+        except Exception as e:
+            print(f"⚠️ Could not fetch followers/following lists: {e}")
+    else:
+        print("ℹ️ Not logged in – cannot fetch followers/following lists. "
+              "Set INSTA_USERNAME and use a saved session.")
+
+    extra["followers_list"] = followers_list
+    extra["following_list"] = following_list
+
+    # 4. Category + Location (Gemini + heuristic, started earlier)
+    try:
+        ai_res = ai_future.result()
+    except Exception:
+        ai_res = heuristic_category_location(stats["bio"], first_five_captions)
+    stats["category"] = ai_res.get("category", "Unknown")
+    stats["location"] = ai_res.get("location", "Unknown")
+
+    # ----------------------------------------------------------------
+    # 5. Export Options: everything into a per-user folder + logs
+    # (posts JSONL log and posts CSV were streamed during the scrape loop)
+    # ----------------------------------------------------------------
+    xlsx_future = None
+    if export:
+        # Followers JSONL (serialized in memory, written in one syscall)
+        try:
+            with open(followers_log, "wb", buffering=1 << 20) as f:
+                f.write(
+                    b"".join(
+                        fastjson.dumps({"username": uname}) + b"\n"
+                        for uname in followers_list
+                    )
+                )
+        except Exception as e:
+            print(f"⚠️ Could not write followers log file ({followers_log}): {e}")
+
+        # Following JSONL
+        try:
+            with open(following_log, "wb", buffering=1 << 20) as f:
+                f.write(
+                    b"".join(
+                        fastjson.dumps({"username": uname}) + b"\n"
+                        for uname in following_list
+                    )
+                )
+        except Exception as e:
+            print(f"⚠️ Could not write following log file ({following_log}): {e}")
+
+        # Interactions summary (top interacted users = top_mentions)
+        try:
+            interactions_summary = {
+                "username": stats["username"],
+                "generated_at": datetime.now().isoformat(),
+                "top_mentions": extra.get("top_mentions", {}),
+                "posts_failed": failed_posts,
+                "total_requests": total_requests,
+            }
+            with open(interactions_log, "wb", buffering=1 << 20) as f:
+                f.write(fastjson.dumps(interactions_summary, indent=True))
+        except Exception as e:
+            print(f"⚠️ Could not write interactions summary file ({interactions_log}): {e}")
+
+        # Profile summary (CSV / JSON / Excel)
+        profile_df = pd.DataFrame(
+            [
+                {
+                    "Profile Name": stats["full_name"],
+                    "Username": stats["username"],
+                    "Bio": stats["bio"],
+                    "Location": stats["location"],
+                    "Category": stats["category"],
+                    "Followers": stats["followers"],
+                    "Following": stats["following"],
+                    "Total Posts": stats["total_posts"],
+                    "Is Verified": stats["is_verified"],
+                    "Avg Likes": round(stats["avg_likes"], 1),
+                    "Avg Comments": round(stats["avg_comments"], 1),
+                    "Avg Views (Reels)": round(stats["avg_views"], 1),
+                    "Engagement Rate %": round(stats["engagement_rate"], 3),
+                    "Viral Video %": round(stats["viral_percentage"], 2),
+                    "Brand Collaborations (Recent)": stats["brand_collabs"],
+                    "Posts Per Week": round(stats["posts_per_week"], 2),
+                    "Scraping Date": datetime.now().strftime("%Y-%m-%d"),
+                }
+            ]
+        )
+        # compression=None keeps pandas from sniffing the extension; if
+        # these exports ever move to .gz, pass compresslevel=1 explicitly
+        # instead of the costly level-9 default.
+        profile_df.to_csv(profile_csv, index=False, compression=None)
+        profile_df.to_json(profile_json, orient="records", indent=2, compression=None)
+        if export_xlsx:
+
+            def _write_xlsx() -> bool:
+                try:
+                    write_xlsx_fast(profile_df, profile_xlsx)
+                    return True
+                except Exception as e:
+                    print(f"⚠️ Could not write Excel file ({profile_xlsx}): {e}")
+                    return False
+
+            xlsx_future = EXECUTOR.submit(_write_xlsx)
+
+    def _xlsx_result() -> bool:
+        # Joined as late as possible so the background write overlaps the
+        # report construction below; Future.result() caches, so the report
+        # line and the recorded path see the same outcome.
+        return xlsx_future is not None and xlsx_future.result()
+
+    # ----------------------------------------------------------------
+    # 6. Print Final Report (one buffered stdout write)
+    # ----------------------------------------------------------------
+    if print_report:
+        # Collect every line and emit them in a single write: one stdout
+        # syscall per profile, and concurrent reports don't interleave.
+        out = [
+            "\n========================================",
+            f"📊 REPORT: @{stats['username']}",
+            f"Name: {stats['full_name']}",
+            "========================================",
+            f"📝 Bio: {stats['bio'].replace(chr(10), ' ')}",
+            f"📍 Location (AI/Heuristic): {stats['location']}",
+            f"🏷️  Category (AI/Heuristic): {stats['category']}",
+            "--------------------",
+            f"👥 Followers: {stats['followers']:,}",
+            f"👉 Following: {stats['following']:,}",
+            f"📝 Total Posts: {stats['total_posts']:,}",
+            f"✅ Verified: {stats['is_verified']}",
+            "",
+            f"👍 Avg Likes: {stats['avg_likes']:.1f}",
+            f"💬 Avg Comments: {stats['avg_comments']:.1f}",
+            f"🎥 Avg Views (Reels): {stats['avg_views']:.1f}",
+            "",
+            f"🚀 Engagement Rate: {stats['engagement_rate']:.3f}%",
+            f"🔥 Viral Video %: {stats['viral_percentage']:.2f}%",
+            f"🤝 Brand Collaborations (recent sample): {stats['brand_collabs']}",
+            f"📅 Posts Per Week: {stats['posts_per_week']:.2f}",
+            f"📆 Scraping Date: {datetime.now().strftime('%Y-%m-%d')}",
+            f"📉 Posts failed during scrape: {failed_posts}",
+            f"📡 Total requests (approx): {total_requests}",
+            "========================================",
+        ]
+
+        if extra["content_distribution"]:
+            out.append("\n📺 Content Type Distribution (% of recent posts):")
+            for ctype, pct in extra["content_distribution"].items():
+                out.append(f"  - {ctype}: {pct:.1f}%")
+        else:
+            out.append("\n📺 Content Type Distribution: No posts.")
+
+        if extra["top_hashtags"]:
+            out.append("\n#️⃣ Top Hashtags:")
+            for tag, freq in extra["top_hashtags"].items():
+                out.append(f"  #{tag}: {freq} times")
+        else:
+            out.append("\n#️⃣ Top Hashtags: None detected.")
+
+        if extra["top_mentions"]:
+            out.append("\n👤 Frequently Mentioned / Tagged Accounts:")
+            for user, freq in extra["top_mentions"].items():
+                out.append(f"  @{user}: {freq} times")
+        else:
+            out.append("\n👤 Frequently Mentioned / Tagged Accounts: None detected.")
+
+        if extra["er_timeline"]:
+            out.append("\n📈 Engagement Rate Over Time (most recent posts):")
+            for item in extra["er_timeline"][-10:]:
+                out.append(
+                    f"  {item['date']} (Post #{item['post_index']}): "
+                    f"{item['er_percent']:.3f}%"
+                )
+        else:
+            out.append("\n📈 Engagement Rate Over Time: No data.")
+
+        if export:
+            out.append("\n📂 Exported Files (inside folder):")
+            out.append(f"  Folder: {output_dir}")
+            out.append(f"  - Posts CSV: {posts_csv}")
+            out.append(f"  - Posts Log (JSONL): {posts_log}")
+            out.append(f"  - Followers Log (JSONL): {followers_log}")
+            out.append(f"  - Following Log (JSONL): {following_log}")
+            out.append(f"  - Interactions Summary (JSON): {interactions_log}")
+            out.append(f"  - Profile CSV: {profile_csv}")
+            out.append(f"  - Profile JSON: {profile_json}")
+            if _xlsx_result():
+                out.append(f"  - Profile Excel: {profile_xlsx}")
+        out.append("\n[+] Analysis complete.\n")
+
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
+
+    # Attach export paths to extra
+    extra["output_dir"] = output_dir
+    extra["posts_csv"] = posts_csv
+    extra["posts_log"] = posts_log
+    extra["followers_log"] = followers_log
+    extra["following_log"] = following_log
+    extra["interactions_log"] = interactions_log
+    extra["profile_csv"] = profile_csv
+    extra["profile_json"] = profile_json
+    extra["profile_xlsx"] = profile_xlsx if _xlsx_result() else None
+
+    return stats, df, extra
+
+
+def _csv_escape(value) -> str:
+    """RFC-4180 style escaping; non-strings pass through str()."""
+    if not isinstance(value, str):
+        return str(value)
+    if '"' in value or "," in value or "\n" in value or "\r" in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def make_row_formatter(cols: List[str]):
+    """
+    Compile a CSV row formatter specialized for a fixed column list.
+
+    Scheduled runs append the same comparison schema every cycle; an
+    eval-compiled single-expression lambda turns one stats dict into one
+    line without csv.DictWriter's per-row, per-field dispatch.
+    """
+    # The eval'd source is built purely from our own column names.
+    parts = ", ".join(f"_e(r[{c!r}])" for c in cols)
+    return eval(f"lambda r: ','.join(({parts},)) + '\\n'", {"_e": _csv_escape})
+
+
+def print_table(rows: List[Dict[str, Any]], cols: List[str]) -> None:
+    """
+    Render selected columns from a list of dicts with str.ljust padding –
+    no DataFrame allocation just to print a table.
+    """
+    def fmt(value) -> str:
+        if isinstance(value, float):
+            return f"{value:.3f}"
+        return str(value)
+
+    table = [[fmt(row.get(c, "")) for c in cols] for row in rows]
+    widths = [
+        max([len(c)] + [len(row[i]) for row in table]) for i, c in enumerate(cols)
+    ]
+    print("  ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    for row in table:
+        print("  ".join(cell.ljust(w) for cell, w in zip(row, widths)))
+
+
+def write_xlsx_fast(df: pd.DataFrame, path: str) -> None:
+    """
+    Write a DataFrame as XLSX via openpyxl's write-only mode.
+
+    pandas' to_excel routes every cell through its styling machinery and
+    is 20-100x slower than CSV; write-only append streams plain rows
+    without that overhead.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        ws.append(row)
+    wb.save(path)
+
+
+def analyze_profiles(
+    usernames: List[str],
+    max_workers: int = 3,
+    on_result=None,
+    **kwargs,
+) -> Dict[str, Tuple[Dict[str, Any], pd.DataFrame, Dict[str, Any]]]:
+    """
+    Analyze several profiles concurrently on a small thread pool.
+
+    All workers share one Instaloader instance so session state and the
+    TLS connection pool are reused. Keep max_workers small: Instagram
+    rate-limits per account/IP, and more than ~3 concurrent scrapes
+    mostly trades speed for 429 responses. Extra keyword arguments are
+    passed through to analyze_profile.
+
+    `on_result(uname, stats, df, extra)` is invoked (on the calling
+    thread) as each profile finishes, so callers can stream results to
+    disk instead of holding the whole batch.
+
+    Returns a dict mapping username → (stats, df, extra); failed
+    profiles map to the same empty tuple analyze_profile returns.
+    """
+    L = get_shared_instaloader()
+    results: Dict[str, Tuple[Dict[str, Any], pd.DataFrame, Dict[str, Any]]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(analyze_profile, uname, L=L, **kwargs): uname
+            for uname in usernames
+        }
+        for fut in as_completed(futures):
+            uname = futures[fut]
+            try:
+                results[uname] = fut.result()
+            except Exception as e:
+                print(f"[-] Error analyzing '{uname}': {e}")
+                results[uname] = ({}, pd.DataFrame(), {})
+            if on_result is not None:
+                try:
+                    on_result(uname, *results[uname])
+                except Exception as e:
+                    print(f"⚠️ Result callback failed for '{uname}': {e}")
+    return results
+
+
+# -------------------------------------------------------------------
+# 🔁 MULTI-PROFILE COMPARISON & OPTIONAL SCHEDULING
+# -------------------------------------------------------------------
+def analyze_multiple_profiles(
+    usernames: List[str],
+    schedule_minutes: int = 0,
+    concurrency: int = 3,
+    export_xlsx: bool = False,
+    export: bool = True,
+):
+    """
+    Analyze multiple profiles concurrently (profiles overlap on the
+    shared thread pool, so the batch costs roughly the slowest profile
+    instead of the sum of all of them).
+    If schedule_minutes > 0, repeats the whole batch periodically.
+    XLSX exports are opt-in (export_xlsx=True), same as analyze_profile.
+    export=False skips every file write – per-profile and comparison –
+    for monitoring sweeps that only need the printed tables.
+    """
+
+    def run_once():
+        print(
+            f"\n====== Analyzing {len(usernames)} profiles "
+            f"(up to {concurrency} in parallel) ======"
+        )
+        # Each profile's summary row is flushed to disk as soon as that
+        # profile finishes, so a crash mid-batch loses nothing and memory
+        # stays flat; the in-memory list only feeds the pretty-print.
+        summaries: List[Dict[str, Any]] = []
+        row_fmt: List[Any] = []
+        csv_f = jsonl_f = None
+
+        def stream_summary(uname, stats, df, extra):
+            nonlocal csv_f, jsonl_f
+            if not stats:
+                return
+            summaries.append(stats)
+            if not export:
+                return
+            # Schema is fixed per run; on the first row, compile the
+            # formatter and open the export files. Opening lazily means a
+            # cycle where every profile fails leaves the previous cycle's
+            # comparison files untouched instead of truncating them.
+            if not row_fmt:
+                cols_full = list(stats)
+                row_fmt.append(make_row_formatter(cols_full))
+                csv_f = open(
+                    "profiles_comparison.csv",
+                    "w",
+                    newline="",
+                    encoding="utf-8",
+                    buffering=1 << 20,
+                )
+                jsonl_f = open("profiles_comparison.jsonl", "wb", buffering=1 << 20)
+                csv_f.write(",".join(map(_csv_escape, cols_full)) + "\n")
+            csv_f.write(row_fmt[0](stats))
+            jsonl_f.write(fastjson.dumps(stats) + b"\n")
+
+        try:
+            analyze_profiles(
+                usernames,
+                max_workers=concurrency,
+                on_result=stream_summary,
+                export=export,
+                print_report=True,
+                export_xlsx=export_xlsx,
+            )
+        finally:
+            if csv_f is not None:
+                csv_f.close()
+                jsonl_f.close()
+
+        if summaries:
+            cols = [
+                "username",
+                "full_name",
+                "followers",
+                "following",
+                "total_posts",
+                "avg_likes",
+                "avg_comments",
+                "avg_views",
+                "engagement_rate",
+                "viral_percentage",
+                "posts_per_week",
+                "category",
+                "location",
+            ]
+            # dedupe order-preserving and drop columns missing from the
+            # stats dicts; the table renders straight from the dicts
+            available = set(summaries[0])
+            cols = [c for c in dict.fromkeys(cols) if c in available]
+            print("\n📊 Comparison Summary (key metrics):")
+            print_table(summaries, cols)
+
+            if not export:
+                return
+            # summaries is already a list of dicts – encode it directly
+            # instead of routing through a DataFrame and pandas' to_json
+            with open("profiles_comparison.json", "wb", buffering=1 << 20) as f:
+                f.write(fastjson.dumps(summaries, indent=True))
+            wrote_comparison_xlsx = False
+            if export_xlsx:
+                try:
+                    # from_records with the known schema skips the per-row
+                    # key-normalization pass of the plain constructor
+                    summary_df = pd.DataFrame.from_records(
+                        summaries, columns=list(summaries[0])
+                    )
+                    write_xlsx_fast(summary_df, "profiles_comparison.xlsx")
+                    wrote_comparison_xlsx = True
+                except Exception as e:
+                    print(f"⚠️ Could not write profiles_comparison.xlsx: {e}")
+            print("\n📂 Comparison exports:")
+            print("  - profiles_comparison.csv")
+            print("  - profiles_comparison.jsonl")
+            print("  - profiles_comparison.json")
+            if wrote_comparison_xlsx:
+                print("  - profiles_comparison.xlsx")
+
+    try:
+        if schedule_minutes > 0:
+            # Deadlines are fixed multiples of the interval on the monotonic
+            # clock, so the cadence does not drift by each run's duration.
+            interval = schedule_minutes * 60
+            next_t = time.monotonic()
+            while True:
+                print(f"\n⏰ Scheduled run at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                run_once()
+                next_t += interval
+                delay = max(0.0, next_t - time.monotonic())
+                if delay:
+                    print(f"\n⏳ Next run in {delay / 60:.1f} minutes...")
+                else:
+                    print("\n⏳ Run overran the schedule interval; starting next run now...")
+                time.sleep(delay)
+        else:
+            run_once()
+    finally:
+        # The shared client lives for the whole batch/schedule; close its
+        # connection pool once on the way out (Ctrl-C included).
+        close_shared_instaloader()
+
+
+# -------------------------------------------------------------------
+# 🏁 CLI ENTRYPOINT
+# -------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Instagram profile analytics scraper")
+    parser.add_argument("usernames", nargs="*", help="Instagram usernames to analyze")
+    parser.add_argument(
+        "--schedule",
+        type=int,
+        default=DEFAULT_SCHEDULE_MINUTES,
+        metavar="MINUTES",
+        help="repeat the whole batch every N minutes (0 = run once)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=3,
+        help="profiles scraped in parallel (keep small to avoid rate limits)",
+    )
+    parser.add_argument(
+        "--xlsx",
+        action="store_true",
+        help="also write XLSX exports (slow; off by default)",
+    )
+    parser.add_argument(
+        "--no-export",
+        action="store_true",
+        help="skip all file writes; print the reports/comparison only",
+    )
+    ns = parser.parse_args()
+
+    usernames: List[str] = ns.usernames
+    if not usernames:
+        entered = input("Enter Instagram Username (or multiple separated by spaces): ").strip()
+        usernames = entered.split()
+    if not usernames:
+        print("No username provided.")
+        sys.exit(0)
+
+    if len(usernames) == 1 and ns.schedule == 0:
+        analyze_profile(
+            usernames[0],
+            export=not ns.no_export,
+            print_report=True,
+            export_xlsx=ns.xlsx,
+        )
+    else:
+        analyze_multiple_profiles(
+            usernames,
+            schedule_minutes=ns.schedule,
+            concurrency=ns.concurrency,
+            export_xlsx=ns.xlsx,
+            export=not ns.no_export,
+        )